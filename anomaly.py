@@ -0,0 +1,191 @@
+# anomaly.py
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# -----------------------------------------------------
+# 기기/유형별 장애 급증 탐지 (증분 롤링 통계)
+# -----------------------------------------------------
+FAST_SPAN = 7          # 최근 발생률 (단기 EWMA) 기간(일)
+SLOW_SPAN = 30         # 기준 발생률 (장기 EWMA) 기간(일)
+DECAY_HORIZON = 90     # 이 기간 이상 공백이 있으면 나머지 감쇠는 근사식으로 처리
+STD_FLOOR = 0.05       # 기준선 편차가 0에 가까운 신규/저빈도 대상의 점수 폭주 방지
+Z_THRESHOLD = 3.0      # 이상 판정 점수 기준
+MIN_RATE = 0.3         # 이상 판정 최소 최근 발생률(건/일)
+
+FAST_ALPHA = 2 / (FAST_SPAN + 1)
+SLOW_ALPHA = 2 / (SLOW_SPAN + 1)
+
+
+def _to_day_numbers(dates):
+    """datetime 시리즈를 일 단위 정수(epoch 기준 일수)로 변환"""
+    return dates.values.astype('datetime64[D]').astype(np.int64)
+
+
+class RollingRateTracker:
+    """
+    대상(기기명/장애유형)별 일 발생 건수의 EWMA 통계를 증분으로 유지하는 클래스
+
+    - 가장 최근 날짜(워터마크)는 '진행 중'으로 보고 확정하지 않습니다.
+    - update()에는 전체 프레임을 넘겨도 되며, 워터마크 이전 날짜의 행은 통계에 다시 반영하지 않습니다.
+      (rank_anomalies()는 소스 버전이 바뀐 경우에만 update()를 호출합니다.)
+    - 워터마크보다 과거 날짜로 늦게 들어온 행은 반영되지 않습니다.
+      (과거 이력이 바뀌었는지는 history_matches()로 확인해 추적기를 새로 만듭니다.)
+    """
+
+    def __init__(self, key_col):
+        self.key_col = key_col
+        self.first_day = None
+        self.open_day = None
+        self.open_counts = {}
+        # key -> [마지막 확정일, 누적 건수, 단기 EWMA, 장기 EWMA, 장기 분산]
+        self.state = {}
+        self.history = (0, 0)  # 워터마크 이전 행의 (건수, 이벤트_ID 합) 지문
+        self._snapshot = None  # 상태가 바뀌기 전까지 재사용하는 순위표
+        self._lock = threading.Lock()
+
+    def update(self, df):
+        """워터마크 이후의 행만 골라 통계를 갱신하고, 반영한 행 수를 반환"""
+        if df.empty or self.key_col not in df.columns: return 0
+
+        with self._lock:
+            prev_open_day = self.open_day
+            all_days = days = _to_day_numbers(df['발생일'])
+            keys = df[self.key_col].values
+            if self.open_day is not None:
+                mask = days >= self.open_day
+                if not mask.any(): return 0
+                days, keys = days[mask], keys[mask]
+
+            day_counts = pd.DataFrame({'day': days, 'key': keys}).dropna().groupby(['day', 'key']).size()
+            for day, counts in day_counts.groupby(level='day'):
+                counts = counts.droplevel('day').to_dict()
+                if day == self.open_day and counts == self.open_counts: continue
+                self._snapshot = None
+                if self.open_day is None:
+                    self.first_day = day
+                elif day > self.open_day:
+                    self._fold(self.open_day, self.open_counts)
+                # 진행 중인 날짜는 입력에 해당 날짜의 전체 행이 있으므로 덮어쓰기
+                self.open_day = day
+                self.open_counts = counts
+            if self.open_day != prev_open_day:
+                # 워터마크가 그대로면 그 이전 행도 그대로이므로 지문은 워터마크가 옮겨질 때만 계산
+                self.history = _history_fingerprint(df, all_days, self.open_day)
+            return len(days)
+
+    def history_matches(self, df):
+        """df의 워터마크 이전 행이 마지막 갱신 때와 같은지 여부 (다르면 증분 갱신 불가)"""
+        if df.empty or self.key_col not in df.columns: return self.open_day is None
+        with self._lock:
+            if self.open_day is None: return True
+            return _history_fingerprint(df, _to_day_numbers(df['발생일']), self.open_day) == self.history
+
+    def _fold(self, day, counts):
+        """확정된 하루치 건수를 각 대상의 통계에 반영 (해당 날짜에 발생한 대상만 갱신)"""
+        for key, cnt in counts.items():
+            s = self.state.get(key)
+            if s is None:
+                # 처음 등장한 대상: 그 이전은 모두 0건이므로 0으로 시작하면 정확함
+                s = self.state[key] = [day - 1, 0, 0.0, 0.0, 0.0]
+            _advance(s, day - 1)
+            _observe(s, cnt)
+
+    def snapshot(self):
+        """현재 시점 기준 대상별 발생률/기준선/점수 순위표 반환 (상태는 변경하지 않음)"""
+        columns = [self.key_col, '최근 발생률', '기준 발생률', '기준 편차', '점수', '누적 건수', '일평균', '이상 여부']
+        with self._lock:
+            if self.open_day is None: return pd.DataFrame(columns=columns)
+            if self._snapshot is not None: return self._snapshot
+
+            n_days = self.open_day - self.first_day + 1
+            fast_scale = np.sqrt(FAST_ALPHA / (2 - FAST_ALPHA))
+            rows = []
+            for key in set(self.state) | set(self.open_counts):
+                s = self.state.get(key)
+                if s is None:
+                    s = [self.open_day - 1, 0, 0.0, 0.0, 0.0]
+                elif self.open_day - s[0] > DECAY_HORIZON and key not in self.open_counts:
+                    continue  # 오래 잠잠한 대상은 최근 발생률이 0에 수렴하므로 제외
+                else:
+                    s = list(s)
+                _advance(s, self.open_day - 1)
+                _observe(s, self.open_counts.get(key, 0))
+
+                _, total, fast, slow, var = s
+                # 단기 EWMA의 표준편차 = 일별 표준편차 * sqrt(a / (2 - a))
+                std = max(np.sqrt(var) * fast_scale, STD_FLOOR)
+                score = (fast - slow) / std
+                rows.append((key, fast, slow, std, score, total, total / n_days))
+
+            rank = pd.DataFrame(rows, columns=columns[:-1])
+            rank['이상 여부'] = (rank['점수'] >= Z_THRESHOLD) & (rank['최근 발생률'] >= MIN_RATE)
+            self._snapshot = rank.sort_values('점수', ascending=False, ignore_index=True)
+            return self._snapshot
+
+
+def _history_fingerprint(df, days, open_day):
+    """open_day 이전 행의 건수와 이벤트_ID 합 (이력이 수정/추가되면 달라짐)"""
+    before = days < open_day
+    id_sum = int(df['이벤트_ID'].values[before].sum()) if '이벤트_ID' in df.columns else 0
+    return int(before.sum()), id_sum
+
+
+def _observe(s, x):
+    """하루치 관측값 x를 단기/장기 EWMA 및 장기 분산에 반영"""
+    s[0] += 1
+    s[1] += x
+    s[2] += FAST_ALPHA * (x - s[2])
+    diff = x - s[3]
+    incr = SLOW_ALPHA * diff
+    s[3] += incr
+    s[4] = (1 - SLOW_ALPHA) * (s[4] + diff * incr)
+
+
+def _advance(s, to_day):
+    """마지막 확정일부터 to_day까지 0건인 날을 반영"""
+    gap = to_day - s[0]
+    if gap <= 0: return
+    exact = min(gap, DECAY_HORIZON)
+    for _ in range(exact):
+        _observe(s, 0)
+    rest = gap - exact
+    if rest > 0:
+        # 긴 공백은 0 관측의 감쇠 계수로 근사 (이미 기준선이 0에 가까운 구간)
+        s[0] += rest
+        s[2] *= (1 - FAST_ALPHA) ** rest
+        s[3] *= (1 - SLOW_ALPHA) ** rest
+        s[4] *= (1 - SLOW_ALPHA) ** rest
+
+
+def _new_trackers():
+    return {'기기명': RollingRateTracker('기기명'), '장애유형': RollingRateTracker('장애유형')}
+
+
+@st.cache_resource
+def _tracker_store():
+    """서버 프로세스 전체에서 공유하는 추적기와, 마지막으로 반영한 소스 버전"""
+    return {'version': None, 'trackers': _new_trackers(), 'lock': threading.Lock()}
+
+
+def rank_anomalies(df):
+    """
+    새로 들어온 행으로 추적기를 갱신하고 {대상 컬럼: 순위표} 반환
+    - 소스 구성/수정시각(df.attrs['소스_버전'])이 마지막 반영 때와 같으면 df도 같으므로
+      갱신 없이 저장된 순위표를 반환 (재실행마다 전체 컬럼을 다시 훑지 않음)
+    - 버전이 바뀌었는데 워터마크 이전 이력까지 달라졌다면 (파일 교체/수정, 과거 날짜 행이 있는
+      소스 추가 등) 추적기를 새로 만들어 전체 이력으로 다시 계산
+    """
+    store = _tracker_store()
+    with store['lock']:
+        version = df.attrs.get('소스_버전')
+        if version is None or version != store['version']:
+            if not all(t.history_matches(df) for t in store['trackers'].values()):
+                store['trackers'] = _new_trackers()
+            for tracker in store['trackers'].values():
+                tracker.update(df)
+            store['version'] = version
+        trackers = store['trackers']
+
+    return {key_col: tracker.snapshot() for key_col, tracker in trackers.items()}
@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
+import startup
 import data_loader as dl
 import charts as ch
 import insights as ins  # [추가] 새로 만든 모듈 임포트
+import anomaly as an
+import sketch as sk
+
+# [신규] 콜드 스타트 측정 기준점: 이 프로세스의 첫 스크립트 실행 시작
+is_first_run = startup.begin_first_run()
 
 # -----------------------------------------------------
 # [신규] 커스텀 디자인 함수 (흰색 텍스트 박스)
@@ -24,12 +30,22 @@ def ui_info(text):
         </div>
     """, unsafe_allow_html=True)
 
+# -----------------------------------------------------
+# [신규] 차트 출력 함수 (경량 차트 모드 적용 + 전송량 기록)
+# -----------------------------------------------------
+chart_payloads = {}
+
+def show_chart(fig, **kwargs):
+    if compact_charts:
+        fig, chart_payloads[kwargs.get('key')] = ch.compact_figure(fig)
+    return st.plotly_chart(fig, **kwargs)
+
 # -----------------------------------------------------
 # 1. 초기 설정 및 데이터 로드
 # -----------------------------------------------------
 st.set_page_config(layout="wide", page_title="장애 발생 현황")
 
-FILE_PATHS = ['kiosk_data_2025.xlsx', 'kiosk_data_2026.xlsx']
+FILE_PATHS = dl.DEFAULT_FILE_PATHS
 df = dl.load_and_combine_data(FILE_PATHS)
 
 if df.empty:
@@ -58,6 +74,7 @@ comparison_df = pd.DataFrame() # 비교할 과거 데이터
 selected_month = '전체'        # 차트 타이틀용
 selected_week = '전체'         # 차트 타이틀용
 prev_week_label = None         # 차트 비교용
+top_filters = {}               # 근사 Top-K 기간 파티션 조건
 
 # =========================================================
 # [MODE 1] 기존 월간/주간 보기 (기존 코드 그대로 이동)
@@ -99,6 +116,9 @@ if analysis_mode == "월간/주간 보기":
 
     # 최종 데이터 확정
     detail_df = current_df.copy()
+
+    if selected_week != '전체': top_filters['주간_라벨'] = selected_week
+    elif selected_month != '전체': top_filters['월_표기'] = selected_month
     
     # 비교 데이터(comparison_df) 설정 (월간/주간용)
     if selected_week != '전체' and prev_week_label:
@@ -132,6 +152,8 @@ else:
         current_df = current_df[current_df['장애유형'] == selected_type]
         
     detail_df = current_df.copy()
+
+    top_filters = {'연도': selected_year, '분기': selected_quarter}
     
     # 비교 데이터(comparison_df) 설정 (전분기 대비)
     # 로직: 1분기면 작년 4분기, 아니면 같은 해 이전 분기
@@ -152,6 +174,20 @@ else:
 
 st.sidebar.markdown(f"**선택된 데이터:** {len(detail_df):,}건")
 
+# [신규] 소스별 중복 제거 건수 (이벤트 식별 컬럼 기준, 같은 파일을 여러 설정으로 읽어도 소스마다 표시)
+dedup_counts = df.attrs.get('중복_제거', [])
+if dedup_counts:
+    with st.sidebar.expander("🧹 중복 제거 현황"):
+        st.caption("기준 컬럼: " + ", ".join(dl.EVENT_KEY_COLUMNS))
+        for i, (file_path, dup_cnt) in enumerate(dedup_counts, 1):
+            st.caption(f"{i}. {file_path}: {dup_cnt:,}건 제거")
+
+# [신규] 대규모 기기군용 근사 Top-K 모드 (기간 파티션 요약을 병합)
+approx_top_mode = st.sidebar.toggle("⚡ 근사 Top-K 모드", value=False, help="기기 수가 많을 때 기간별 요약만 병합해 Top 기기를 빠르게 계산합니다.")
+
+# [신규] 원격지 접속용 경량 차트 모드 (다운샘플링 + 바이너리 배열 + 메타데이터 축소)
+compact_charts = st.sidebar.toggle("📦 경량 차트 모드", value=False, help="차트 전송량을 줄여 느린 네트워크에서 화면 표시를 빠르게 합니다.")
+
 
 # -----------------------------------------------------
 # 3. KPI 지표 계산 (공통 로직 활용)
@@ -212,6 +248,11 @@ if not detail_df.empty and '장애유형' in detail_df.columns:
 else:
     with kpi3: st.metric("최다 발생 유형", "-")
 
+# [신규] 콜드 스타트 측정: KPI까지 그려진 시점을 첫 의미 있는 화면으로 기록
+if is_first_run:
+    startup.mark("첫 실행 → KPI 표시")
+    startup.mark_since_boot("부팅 → KPI 표시")
+
 st.markdown("---")
 
 
@@ -229,7 +270,7 @@ with col1:
         # [추가] AI 인사이트
         ui_info(ins.analyze_trend(base_df, '분기', '분기'))
         
-        st.plotly_chart(ch.plot_quarterly_trend(base_df, selected_year), width="stretch", key="chart_quarterly")
+        show_chart(ch.plot_quarterly_trend(base_df, selected_year), width="stretch", key="chart_quarterly")
         
     else:
         st.subheader("1️⃣ 월간 장애 발생 추이")
@@ -239,20 +280,20 @@ with col1:
         # [추가] AI 인사이트
         ui_info(ins.analyze_trend(base_df, '월_표기', '월'))
         
-        st.plotly_chart(ch.plot_monthly_trend(base_df, selected_type, selected_month), width="stretch", key="chart_monthly")
+        show_chart(ch.plot_monthly_trend(base_df, selected_type, selected_month), width="stretch", key="chart_monthly")
 
 with col2:
     if analysis_mode == "분기별 보기":
          st.subheader(f"2️⃣ 주간 장애 발생 추이 ({selected_quarter})")
          # [추가] 주간 데이터에 대한 인사이트는 생략하거나 필요시 추가 가능
-         st.plotly_chart(ch.plot_weekly_trend(current_df), width="stretch", key="chart_weekly_quarter")
+         show_chart(ch.plot_weekly_trend(current_df), width="stretch", key="chart_weekly_quarter")
     
     elif selected_week == '전체':
         st.subheader(f"2️⃣ 주간 장애 발생 추이 ({selected_month if selected_month != '전체' else '전체'})")
-        st.plotly_chart(ch.plot_weekly_trend(current_df), width="stretch", key="chart_weekly")
+        show_chart(ch.plot_weekly_trend(current_df), width="stretch", key="chart_weekly")
     else:
         st.subheader(f"2️⃣ 일별 발생 패턴 (이번 주 vs 지난주)")
-        st.plotly_chart(ch.plot_daily_comparison(detail_df, comparison_df, selected_week, prev_week_label), width="stretch", key="chart_daily")
+        show_chart(ch.plot_daily_comparison(detail_df, comparison_df, selected_week, prev_week_label), width="stretch", key="chart_daily")
 
 st.markdown("---")
 
@@ -266,13 +307,13 @@ col3, col4 = st.columns(2)
 with col3:
     # st.subheader("3️⃣ 요일별 발생 패턴") -> 위에서 통합 제목을 썼으므로 생략 가능하나 유지해도 됨
     if not detail_df.empty:
-        st.plotly_chart(ch.plot_day_pattern(detail_df), width="stretch", key="chart_day_pat")
+        show_chart(ch.plot_day_pattern(detail_df), width="stretch", key="chart_day_pat")
     else: st.info("데이터 없음")
 
 with col4:
     # st.subheader("4️⃣ 시간대별 집중 발생")
     if not detail_df.empty:
-        st.plotly_chart(ch.plot_time_pattern(detail_df), width="stretch", key="chart_time_pat")
+        show_chart(ch.plot_time_pattern(detail_df), width="stretch", key="chart_time_pat")
     else: st.info("데이터 없음")
 
 st.markdown("---")
@@ -280,16 +321,47 @@ st.markdown("---")
 st.subheader("5️⃣ 장애 다발 기기 Top 3")
 # [추가] 기기 분석 AI 인사이트
 if not detail_df.empty:
-    ui_info(ins.analyze_top_devices(detail_df))
+    top_summary = None
+    if approx_top_mode:
+        top_summary = sk.query_top_devices(
+            sk.load_partition_summaries(FILE_PATHS),
+            type_name=selected_type if selected_type != '전체' else None, **top_filters
+        )
+        top_errors = ", ".join(f"{dev} +{err}건" for dev, _, err, _ in top_summary.top(3))
+        st.caption(
+            f"근사 Top-K 모드: 표시 기기별 최대 과소 집계 [{top_errors}] · 목록에 없는 기기는 최대 {top_summary.floor}건 "
+            f"(전체 {top_summary.total:,}건 기준, 카운터 {top_summary.capacity}개)"
+        )
+
+    ui_info(ins.analyze_top_devices(detail_df, top_summary))
     
-    fig_top3 = ch.plot_top3_devices(detail_df)
+    fig_top3 = ch.plot_top3_devices(detail_df, top_summary)
     if fig_top3:
-        st.plotly_chart(fig_top3, width="stretch", key="chart_device_top3")
+        show_chart(fig_top3, width="stretch", key="chart_device_top3")
     else: st.info("데이터 없음")
 else: st.info("데이터 없음")
 
 st.markdown("---")
 
+# [신규] 기기/유형별 장애 급증 탐지 (필터와 무관하게 전체 이력의 최근 시점 기준)
+st.subheader("5️⃣-1 장애 급증 기기 탐지 (최근 기준)")
+anomaly_ranks = an.rank_anomalies(df)
+device_rank = anomaly_ranks['기기명']
+type_rank = anomaly_ranks['장애유형']
+ui_info(ins.analyze_anomalies(device_rank, type_rank))
+
+if not device_rank.empty:
+    tab_dev, tab_type = st.tabs(["🖥️ 기기별 순위", "🛠️ 유형별 순위"])
+    with tab_dev:
+        show_chart(ch.plot_anomaly_ranking(device_rank, '기기명'), width="stretch", key="chart_anomaly_device")
+        st.dataframe(device_rank.head(20).round(2), width="stretch", hide_index=True)
+    with tab_type:
+        show_chart(ch.plot_anomaly_ranking(type_rank, '장애유형'), width="stretch", key="chart_anomaly_type")
+        st.dataframe(type_rank.round(2), width="stretch", hide_index=True)
+else: st.info("데이터 없음")
+
+st.markdown("---")
+
 
 # -----------------------------------------------------
 # 5. 상호작용 및 상세 데이터 (기존 유지)
@@ -326,7 +398,7 @@ if not prev_period_df.empty and not detail_df.empty:
         # charts 모듈 함수 호출
         fig_bar = ch.plot_comparison_bar(bar_df_long)
         
-        event_bar = st.plotly_chart(
+        event_bar = show_chart(
             fig_bar, width="stretch", key="chart_grouped_bar",
             on_select="rerun", selection_mode="points"
         )
@@ -346,13 +418,13 @@ if not prev_period_df.empty and not detail_df.empty:
             st.subheader("📉 이전 기간")
             pie_prev = prev_period_df.groupby('장애유형').size().reset_index(name='건수')
             pull_vals_p = [0.2 if x == current_selection else 0 for x in pie_prev['장애유형']]
-            st.plotly_chart(ch.plot_pie_chart(pie_prev, pull_vals_p), width="stretch", key="pie_prev")
+            show_chart(ch.plot_pie_chart(pie_prev, pull_vals_p), width="stretch", key="pie_prev")
             
         with c_curr:
             st.subheader("📈 현재 기간")
             pie_curr = detail_df.groupby('장애유형').size().reset_index(name='건수')
             pull_vals_c = [0.2 if x == current_selection else 0 for x in pie_curr['장애유형']]
-            st.plotly_chart(ch.plot_pie_chart(pie_curr, pull_vals_c), width="stretch", key="pie_curr")
+            show_chart(ch.plot_pie_chart(pie_curr, pull_vals_c), width="stretch", key="pie_curr")
 
 else:
     # 단독 모드 (비교 데이터 없음)
@@ -361,7 +433,7 @@ else:
         pie_data_curr = detail_df.groupby('장애유형').size().reset_index(name='건수')
         current_selection = st.session_state.dashboard_selected_type
         pull_vals = [0 if x == current_selection else 0 for x in pie_data_curr['장애유형']]
-        st.plotly_chart(ch.plot_pie_chart(pie_data_curr, pull_vals), width="stretch", key="pie_solo")
+        show_chart(ch.plot_pie_chart(pie_data_curr, pull_vals), width="stretch", key="pie_solo")
 
 
 # -----------------------------------------------------
@@ -401,4 +473,19 @@ else:
             s_df['발생일'] = s_df['발생일'].apply(lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else "")
         st.dataframe(s_df, width="stretch", hide_index=True)
     else:
-        st.info("데이터가 없습니다.")
\ No newline at end of file
+        st.info("데이터가 없습니다.")
+
+# [신규] 콜드 스타트 지표 (서버 프로세스당 최초 1회 값)
+if is_first_run:
+    startup.mark("첫 실행 → 전체 화면 표시")
+    startup.mark_since_boot("부팅 → 전체 화면 표시")
+if chart_payloads:
+    over_budget = sum(size > ch.FIGURE_BYTE_BUDGET for size in chart_payloads.values())
+    st.sidebar.caption(
+        f"📦 차트 전송량: {len(chart_payloads)}개 / 총 {sum(chart_payloads.values()) / 1024:.1f}KB "
+        f"(차트당 예산 {ch.FIGURE_BYTE_BUDGET / 1024:.1f}KB, 초과 {over_budget}개)"
+    )
+
+cold_start = startup.cold_start_metrics()
+st.sidebar.markdown("---")
+st.sidebar.caption(" · ".join(f"⏱️ {name} {sec:.1f}초" for name, sec in cold_start.items()))
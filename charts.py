@@ -1,6 +1,8 @@
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
+import numpy as np
 
 # -----------------------------------------------------
 # 차트 생성 함수 모음
@@ -21,12 +23,21 @@ def plot_monthly_trend(base_df, selected_type, selected_month):
     fig.update_layout(xaxis_title="월", yaxis_title="건수", margin=dict(t=20, b=20, l=20, r=20))
     return fig
 
+WEEK_TICK_LIMIT = 26  # 이 주 수까지는 모든 주에 주간 라벨 눈금 표시 (넘으면 날짜 눈금 자동 배치)
+
 def plot_weekly_trend(current_df):
-    """주간 장애 발생 추이 라인 차트"""
+    """
+    주간 장애 발생 추이 라인 차트
+    x축은 주 시작일 날짜축이므로 빠진 주나 경량 모드의 다운샘플링이 있어도 주 간격이 그대로 유지됨
+    """
     w_stats = current_df.groupby(['주_시작일', '주간_라벨']).size().reset_index(name='건수').sort_values('주_시작일')
-    fig = px.line(w_stats, x='주간_라벨', y='건수', markers=True, text='건수')
-    fig.update_traces(textposition="top center")
-    fig.update_layout(xaxis_tickangle=-45, margin=dict(t=20, b=20, l=20, r=20))
+    fig = px.line(w_stats, x='주_시작일', y='건수', markers=True, text='건수', custom_data=['주간_라벨'])
+    fig.update_traces(textposition="top center", hovertemplate="%{customdata[0]}<br>건수: %{y}<extra></extra>")
+    fig.update_layout(xaxis_title="주간", xaxis_tickangle=-45, margin=dict(t=20, b=20, l=20, r=20))
+    if len(w_stats) <= WEEK_TICK_LIMIT:
+        fig.update_xaxes(tickvals=w_stats['주_시작일'], ticktext=w_stats['주간_라벨'])
+    else:
+        fig.update_xaxes(tickformat='%m/%d')
     return fig
 
 def plot_daily_comparison(detail_df, comparison_df, selected_week, prev_week_label):
@@ -58,14 +69,21 @@ def plot_time_pattern(detail_df):
     fig.update_layout(margin=dict(t=20, b=20, l=20, r=20))
     return fig
 
-def plot_top3_devices(detail_df):
-    """기기별 Top 3 막대 차트"""
-    top_devices_list = detail_df['기기명'].value_counts().head(3).index.tolist()
+def plot_top3_devices(detail_df, top_summary=None):
+    """기기별 Top 3 막대 차트 (top_summary가 주어지면 근사 Top-K 요약의 순위/유형별 건수만 사용)"""
+    if top_summary is not None:
+        top3 = top_summary.top(3)
+        top_devices_list = [dev for dev, _, _, _ in top3]
+        chart_data = pd.DataFrame(
+            [(dev, err_type, cnt) for dev, _, _, breakdown in top3 for err_type, cnt in breakdown.items()],
+            columns=['기기명', '장애유형', '건수']
+        )
+    else:
+        top_devices_list = detail_df['기기명'].value_counts().head(3).index.tolist()
+        top3_df = detail_df[detail_df['기기명'].isin(top_devices_list)]
+        chart_data = top3_df.groupby(['기기명', '장애유형']).size().reset_index(name='건수')
     if not top_devices_list: return None
     
-    top3_df = detail_df[detail_df['기기명'].isin(top_devices_list)]
-    chart_data = top3_df.groupby(['기기명', '장애유형']).size().reset_index(name='건수')
-    
     fig = px.bar(
         chart_data, y='기기명', x='건수', color='장애유형', 
         text='건수', orientation='h', 
@@ -128,4 +146,122 @@ def plot_quarterly_trend(base_df, selected_year):
         yaxis_title="건수", 
         margin=dict(t=40, b=20, l=20, r=20)
     )
-    return fig
\ No newline at end of file
+    return fig
+def plot_anomaly_ranking(rank_df, key_col, top_n=10):
+    """
+    [신규] 장애 급증 점수 순위 막대 차트 (이상 판정 대상은 빨간색)
+    """
+    top_df = rank_df.head(top_n).iloc[::-1]
+    colors = ['#EF553B' if flag else '#ABACF7' for flag in top_df['이상 여부']]
+    fig = go.Figure(data=[
+        go.Bar(
+            y=top_df[key_col], x=top_df['점수'], orientation='h', marker_color=colors,
+            text=top_df['점수'].round(1), customdata=top_df[['최근 발생률', '기준 발생률']].round(2),
+            hovertemplate="%{y}<br>점수 %{x:.1f}<br>최근 %{customdata[0]}건/일 · 평소 %{customdata[1]}건/일<extra></extra>"
+        )
+    ])
+    fig.update_traces(textposition='outside')
+    fig.update_layout(xaxis_title="급증 점수", yaxis_title=key_col, height=350, margin=dict(t=20, b=20, l=20, r=20))
+    return fig
+
+# -----------------------------------------------------
+# [신규] 경량 차트 모드 (원격지 접속 시 전송량 절감)
+# -----------------------------------------------------
+COMPACT_MAX_POINTS = 120     # 라인 차트 최대 점 수 (초과 시 구간별 최소/최대값만 유지)
+COMPACT_TEXT_LIMIT = 30      # 이 개수를 넘는 점별 텍스트 라벨은 제거 (값은 hover로 확인)
+FIGURE_BYTE_BUDGET = 6000    # 차트 1개당 목표 전송량(바이트)
+_NUMERIC_ATTRS = ('x', 'y', 'values', 'text')
+
+
+def figure_payload_bytes(fig):
+    """브라우저로 전송되는 차트 JSON 크기(바이트)"""
+    return len(pio.to_json(fig, validate=False).encode('utf-8'))
+
+
+def _compact_array(values):
+    """숫자 배열을 값 범위에 맞는 가장 작은 dtype으로 변환 (plotly가 바이너리로 인코딩)"""
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'iub' and arr.size:
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= arr.min() and arr.max() <= info.max:
+                return arr.astype(dtype)
+    elif arr.dtype.kind == 'f':
+        return arr.astype(np.float32)
+    return values
+
+
+def _minmax_indices(y, max_points):
+    """구간마다 최소/최대값 위치만 남겨 급등락을 보존하는 다운샘플링 인덱스"""
+    n = len(y)
+    edges = np.linspace(0, n, max(max_points // 2, 1) + 1).astype(int)
+    keep = {0, n - 1}
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            seg = y[lo:hi]
+            keep.update((lo + int(np.nanargmin(seg)), lo + int(np.nanargmax(seg))))
+    return np.array(sorted(keep))
+
+
+def _is_categorical(values):
+    """문자열 등 범주형 x값 여부 (범주축은 점을 건너뛰면 남은 점이 등간격으로 붙어 시간축이 왜곡됨)"""
+    arr = np.asarray(values)
+    return arr.dtype.kind in 'OUS' and not all(isinstance(v, (pd.Timestamp, np.datetime64)) for v in arr)
+
+
+def _compact_trace(trace, max_points):
+    """trace 하나에 다운샘플링(숫자/날짜 x축만), 텍스트 라벨 제거, 숫자 배열 축소 적용"""
+    if (trace.type == 'scatter' and trace.y is not None and len(trace.y) > max_points
+            and not (trace.x is not None and _is_categorical(trace.x))):
+        idx = _minmax_indices(np.asarray(trace.y, dtype=float), max_points)
+        for attr in ('x', 'y', 'text', 'customdata', 'hovertext'):
+            values = getattr(trace, attr)
+            if values is not None and len(values) == len(trace.y):
+                setattr(trace, attr, np.asarray(values)[idx])
+
+    if trace.text is not None and not isinstance(trace.text, str) and len(trace.text) > COMPACT_TEXT_LIMIT:
+        trace.text = None
+        if trace.type == 'scatter' and trace.mode:
+            trace.mode = trace.mode.replace('+text', '')
+        if trace.hovertemplate:
+            value_ref = '%{x}' if getattr(trace, 'orientation', None) == 'h' else '%{y}'
+            trace.hovertemplate = trace.hovertemplate.replace('%{text}', value_ref)
+
+    for attr in _NUMERIC_ATTRS:
+        values = getattr(trace, attr, None)
+        if values is not None and not isinstance(values, str):
+            setattr(trace, attr, _compact_array(values))
+    marker = getattr(trace, 'marker', None)
+    color = getattr(marker, 'color', None)
+    if color is not None and not isinstance(color, str):
+        marker.color = _compact_array(color)
+
+
+def _has_long_series(fig, min_points):
+    """다운샘플링으로 더 줄일 수 있는 라인 trace가 있는지 여부"""
+    return any(
+        t.type == 'scatter' and t.y is not None and len(t.y) > min_points
+        and not (t.x is not None and _is_categorical(t.x))
+        for t in fig.data
+    )
+
+
+def compact_figure(fig, byte_budget=FIGURE_BYTE_BUDGET, max_points=COMPACT_MAX_POINTS):
+    """
+    [신규] 차트 전송량 축소: 템플릿의 trace 유형별 기본값 제거, 긴 시계열 최소/최대 보존 다운샘플링,
+    긴 텍스트 라벨 제거, 숫자 배열 바이너리 인코딩. 예산을 넘으면 점 수를 절반씩 줄여 재시도.
+    반환: (축소된 figure, 전송 바이트)
+    """
+    if fig.layout.template is not None:
+        fig.layout.template = go.layout.Template(layout=fig.layout.template.layout)
+
+    for trace in fig.data:
+        _compact_trace(trace, max_points)
+    size = figure_payload_bytes(fig)
+
+    while size > byte_budget and max_points > 20 and _has_long_series(fig, 20):
+        max_points //= 2
+        for trace in fig.data:
+            _compact_trace(trace, max_points)
+        size = figure_payload_bytes(fig)
+    return fig, size
@@ -1,37 +1,153 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
+import os
+import json
+import threading
+import sources as src
+
+# 경로 문자열 또는 소스 설정 dict (형식/별칭/dtype/시각 형식은 sources.py 참고)
+DEFAULT_FILE_PATHS = ['kiosk_data_2025.xlsx', 'kiosk_data_2026.xlsx']
+
+# 같은 장애 건으로 판단하는 기준 컬럼 (파일에 있는 컬럼만 사용)
+EVENT_KEY_COLUMNS = ['발생일', '발생시간', '기기명', '장애알람']
+
+# seen-set을 따로 유지하는 소스 구성(file_paths) 수 (초과하면 가장 오래 쓰지 않은 구성부터 제거)
+SEEN_STORE_MAX_CONFIGS = 8
+
+# -----------------------------------------------------
+# [신규] 소스 단위 로드 + 이벤트 ID 해시 (파일이 바뀔 때만 다시 계산)
+# -----------------------------------------------------
+@st.cache_data(max_entries=32)
+def _load_source(source, mtime, key_columns):
+    """
+    소스 하나를 청크 단위로 읽어 표준 스키마로 정규화하고, 이벤트 식별 컬럼만으로 해시한 '이벤트_ID'를 추가
+    식별 컬럼이 모두 비어 있는 행(엑셀의 빈 행 등)은 해시 전에 제외
+    (mtime은 캐시 키 용도: 파일이 수정되면 다시 읽음)
+    """
+    chunks = []
+    for chunk in src.iter_normalized_chunks(source):
+        # 소스마다 dtype이 달라도 같은 건이면 같은 ID가 되도록 문자열 기준으로 해시
+        key_cols = [c for c in key_columns if c in chunk.columns] or list(chunk.columns)
+        chunk = chunk.dropna(subset=key_cols, how='all')
+        if chunk.empty: continue
+        chunk['이벤트_ID'] = pd.util.hash_pandas_object(chunk[key_cols].astype(str), index=False).values
+        chunks.append(chunk)
+    if not chunks: return pd.DataFrame()
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+@st.cache_resource
+def _seen_event_store():
+    """
+    서버 프로세스 전체에서 유지하는 이벤트_ID seen-set
+    소스 구성(정규화된 소스 설정 순서 + 식별 컬럼)마다 항목 목록을 따로 두고,
+    각 항목에 소스의 mtime, 중복 마스크, 남긴 ID(정렬 배열)를 파일 순서대로 보관
+    """
+    return {'configs': {}, 'lock': threading.Lock()}
+
+
+def _spec_key(source):
+    """소스 설정을 비교 가능한 문자열로 변환 (같은 파일이라도 별칭/형식/dtype이 다르면 다른 소스)"""
+    return json.dumps(src.as_spec(source), sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _contains(sorted_ids, ids):
+    """정렬된 ID 배열에 ids 각각이 있는지 여부 (이진 탐색)"""
+    if not len(sorted_ids): return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(sorted_ids, ids).clip(max=len(sorted_ids) - 1)
+    return sorted_ids[pos] == ids
+
+
+def _dedup_sources(source_frames, key_columns):
+    """
+    소스 순서대로 이벤트_ID 기준 중복을 제거
+    같은 소스 구성에서 앞쪽 소스들이 그대로면(설정/mtime/행 수 동일) 저장된 결과를 재사용하고,
+    바뀐 소스부터만 새로 계산. 새 배치는 이전 소스들의 정렬된 ID 배열에 대한 이진 탐색으로만
+    비교하므로 과거 데이터를 다시 해시하거나 다시 정렬하지 않음
+    반환: (중복 제거된 프레임 목록, [(파일 경로, 제거된 중복 건수)] - 소스 순서)
+    """
+    store = _seen_event_store()
+    spec_keys = [_spec_key(source) for source, _, _, _ in source_frames]
+    config_key = (tuple(spec_keys), key_columns)
+    kept_frames, removed = [], []
+    with store['lock']:
+        configs = store['configs']
+        entries = configs.pop(config_key, [])
+        configs[config_key] = entries  # 최근 사용 구성을 맨 뒤로
+        while len(configs) > SEEN_STORE_MAX_CONFIGS:
+            del configs[next(iter(configs))]
+
+        for i, (_, file_path, mtime, frame) in enumerate(source_frames):
+            entry_key = (spec_keys[i], mtime)
+            if i < len(entries) and entries[i]['key'] == entry_key and len(entries[i]['dup_mask']) == len(frame):
+                entry = entries[i]
+            else:
+                # 이 소스부터는 기준이 달라졌으므로 뒤쪽 항목은 버리고 다시 계산
+                del entries[i:]
+                ids = frame['이벤트_ID'].values
+                dup_mask = pd.Series(ids).duplicated().to_numpy(copy=True)
+                for prev in entries:
+                    dup_mask |= _contains(prev['ids'], ids)
+                entry = {'key': entry_key, 'dup_mask': dup_mask, 'ids': np.unique(ids[~dup_mask])}
+                entries.append(entry)
+            removed.append((file_path, int(entry['dup_mask'].sum())))
+            kept_frames.append(frame[~entry['dup_mask']])
+        del entries[len(source_frames):]
+    return kept_frames, removed
 
 # -----------------------------------------------------
 # 데이터 로드 및 전처리 함수
 # -----------------------------------------------------
-@st.cache_data(ttl=60)
-def load_and_combine_data(file_paths): 
+def source_versions(file_paths):
+    """소스별 (경로, 수정시각) 튜플 (파일이 없거나 형식을 알 수 없으면 수정시각 None) - 통합 데이터의 캐시 키"""
+    versions = []
+    for source in file_paths:
+        try:
+            file_path = src.as_spec(source)['path']
+            versions.append((file_path, os.path.getmtime(file_path)))
+        except Exception:
+            versions.append((str(source), None))
+    return tuple(versions)
+
+
+def load_and_combine_data(file_paths, key_columns=tuple(EVENT_KEY_COLUMNS)):
     """
-    여러 엑셀 파일을 통합하고 전처리하는 함수
+    여러 소스(xlsx/csv/jsonl 경로 또는 소스 설정 dict)를 통합하고 전처리하는 함수
+    결과는 소스 수정시각 기준으로 캐시되므로 파일이 바뀔 때만 다시 계산 (TTL 만료로 인한 재계산 없음)
+    """
+    return combine_sources(file_paths, source_versions(file_paths), tuple(key_columns))
+
+
+@st.cache_data(max_entries=8)
+def combine_sources(file_paths, versions, key_columns=tuple(EVENT_KEY_COLUMNS)): 
+    """
+    source_versions(file_paths) 시점의 소스들을 통합하고 전처리 (versions는 캐시 키 용도)
+    중복 제거는 key_columns 기준 이벤트_ID로 수행하며, 소스별 제거 건수는 df.attrs['중복_제거']에 기록
     """
     try:
-        all_df_list = []
+        source_frames, loaded_versions = [], []
         
-        for file_path in file_paths:
+        for source, (file_path, mtime) in zip(file_paths, versions):
             try:
-                xls = pd.ExcelFile(file_path)
-                sheet_data = [xls.parse(sheet_name) for sheet_name in xls.sheet_names]
-                if sheet_data:
-                    all_df_list.extend(sheet_data)
+                if mtime is None: raise FileNotFoundError(f"파일을 찾을 수 없거나 지원하지 않는 형식입니다: {file_path}")
+                frame = _load_source(source, mtime, tuple(key_columns))
+                if not frame.empty:
+                    source_frames.append((source, file_path, mtime, frame))
+                    loaded_versions.append((file_path, mtime))
             except Exception as e:
-                print(f"파일 로드 실패 ({file_path}): {e}")
+                print(f"파일 로드 실패 ({source}): {e}")
                 continue
 
-        if not all_df_list: return pd.DataFrame()
+        if not source_frames: return pd.DataFrame()
         
-        # 1. 병합
+        # 1. 중복 제거 (파생 컬럼 추가 전, 이벤트_ID 기준) 후 병합
+        all_df_list, dedup_counts = _dedup_sources(source_frames, tuple(key_columns))
         df = pd.concat(all_df_list, ignore_index=True)
         
-        # 2. 전처리
-        if '접수일시' in df.columns:
-            df.rename(columns={'접수일시': '발생일'}, inplace=True)
-        
+        # 2. 전처리 (컬럼명 별칭은 sources.normalize_chunk에서 처리됨)
         df['발생일'] = pd.to_datetime(df.get('발생일'), errors='coerce')
         df.dropna(subset=['발생일'], inplace=True)
         
@@ -61,8 +177,8 @@ def load_and_combine_data(file_paths):
         df['주_종료일'] = df['주_시작일'] + pd.to_timedelta(6, unit='D')
         df['주간_라벨'] = df['주_시작일'].dt.strftime('%m/%d') + "~" + df['주_종료일'].dt.strftime('%m/%d')
         
-        # 중복 제거 (마지막에 수행)
-        df.drop_duplicates(inplace=True)
+        df.attrs['중복_제거'] = dedup_counts
+        df.attrs['소스_버전'] = tuple(loaded_versions)
         
         return df
 
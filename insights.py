@@ -54,14 +54,23 @@ from collections import Counter
 
 # ... (기존 analyze_trend, analyze_day_time 함수는 그대로 유지) ...
 
-def analyze_top_devices(df):
+def analyze_top_devices(df, top_summary=None):
     """
     [섹션 5] 기기별 편중도 및 Top 3 상세 원인 분석 (줄바꿈 + 중복 유형 하이라이트)
+    top_summary가 주어지면 전체 기기 카운트 대신 근사 Top-K 요약(sketch.TopKSummary)만 사용 (df는 전체 건수에만 사용)
     """
     if df.empty: return "분석할 데이터가 없습니다."
 
-    # 기기별 건수 카운트 및 상위 3개 추출
-    dev_counts = df['기기명'].value_counts().head(3)
+    # 기기별 건수 카운트 및 상위 3개 추출 (+ 기기별 장애유형 건수, 근사 모드의 최대 오차)
+    if top_summary is not None:
+        top3 = top_summary.top(3)
+        dev_counts = pd.Series([cnt for _, cnt, _, _ in top3], index=[dev for dev, _, _, _ in top3], dtype=int)
+        dev_errors = {dev: err for dev, _, err, _ in top3}
+        dev_breakdowns = {dev: breakdown for dev, _, _, breakdown in top3}
+    else:
+        dev_counts = df['기기명'].value_counts().head(3)
+        dev_errors = dict.fromkeys(dev_counts.index, 0)
+        dev_breakdowns = {dev: df[df['기기명'] == dev]['장애유형'].value_counts().to_dict() for dev in dev_counts.index}
     
     if dev_counts.empty: return "데이터가 없습니다."
 
@@ -69,7 +78,7 @@ def analyze_top_devices(df):
     # 상위 3개 기기 각각 어떤 에러들이 있었는지 집합(Set)으로 수집
     device_error_sets = []
     for device in dev_counts.index:
-        errors = set(df[df['기기명'] == device]['장애유형'].unique())
+        errors = set(dev_breakdowns[device])
         device_error_sets.append(errors)
     
     # 전체 에러 리스트를 만들어서 카운팅
@@ -90,8 +99,7 @@ def analyze_top_devices(df):
 
     # Top 1 ~ Top 3 반복문 실행
     for i, (device, total_val) in enumerate(dev_counts.items(), 1):
-        target_device_df = df[df['기기명'] == device]
-        error_counts = target_device_df['장애유형'].value_counts()
+        error_counts = dev_breakdowns[device]
         
         # 상세 내역 리스트 만들기
         details = []
@@ -109,9 +117,14 @@ def analyze_top_devices(df):
         # \n 뒤에 공백을 주어 들여쓰기 효과
         detail_str = "\n   - ".join(details)
         
-        comment += f"\n\n**{i}위. {device} (총 {total_val}건)**\n"
+        # 근사 모드에서 오차가 있으면 건수를 범위로 표시 (유형별 건수는 하한값)
+        total_str = f"{total_val}건" if dev_errors[device] == 0 else f"{total_val}~{total_val + dev_errors[device]}건"
+        comment += f"\n\n**{i}위. {device} (총 {total_str})**\n"
         comment += f"   - {detail_str}"
 
+    if top_summary is not None:
+        comment += f"\n\n※ 근사 Top-K 모드: 건수가 범위로 표시된 기기는 유형별 건수가 최소값이며, 목록에 없는 기기는 최대 {top_summary.floor}건입니다."
+
     comment += "\n\n반복적인 장애가 발생하는 기기에 대해서는 부품 교체 이력 및 설치 환경(전원/통신) 정밀 진단이 권장됩니다."
     
     return comment
@@ -185,3 +198,27 @@ def analyze_comparison(prev_df, curr_df):
     full_comment = "💡 **AI 분석:** 상세 비교 결과입니다.\n\n" + "\n\n".join(comment_parts)
               
     return full_comment
+
+# [신규] 기기/유형별 장애 급증 탐지 결과 분석
+def analyze_anomalies(device_rank, type_rank):
+    """
+    [섹션 5-1] 최근 발생률이 기준선을 벗어난 기기/유형 요약
+    """
+    if device_rank.empty: return "분석할 데이터가 없습니다."
+
+    flagged = device_rank[device_rank['이상 여부']]
+    flagged_types = type_rank[type_rank['이상 여부']] if not type_rank.empty else type_rank
+
+    if flagged.empty and flagged_types.empty:
+        return "💡 **AI 분석:** 최근 발생률이 평소 기준선을 크게 벗어난 기기나 장애 유형은 없습니다."
+
+    comment = "💡 **AI 분석:** 최근 발생률이 평소 기준선을 크게 벗어난 대상입니다."
+    for _, row in flagged.head(3).iterrows():
+        highlight = f"<span style='color: #FF6B6B; font-weight: bold;'>{row['기기명']}</span>"
+        comment += f"\n\n- {highlight}: 최근 일 {row['최근 발생률']:.2f}건 (평소 {row['기준 발생률']:.2f}건, 점수 {row['점수']:.1f})"
+    if not flagged_types.empty:
+        type_names = ", ".join(f"'{t}'" for t in flagged_types['장애유형'].head(3))
+        comment += f"\n\n장애 유형 기준으로는 {type_names} 유형이 급증하고 있습니다."
+
+    comment += "\n\n급증 대상은 최근 조치 이력과 설치 환경 변화를 우선 확인하시기 바랍니다."
+    return comment
@@ -0,0 +1,13 @@
+# server.py
+# 실행: python server.py [streamlit run 옵션...]
+# (streamlit run app.py 대신 사용하면 첫 방문 전에 데이터/집계 캐시가 채워집니다)
+import os
+import sys
+import startup
+import data_loader as dl
+from streamlit.web import cli as stcli
+
+if __name__ == "__main__":
+    startup.start_warmup(dl.DEFAULT_FILE_PATHS)
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")] + sys.argv[1:]
+    sys.exit(stcli.main())
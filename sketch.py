@@ -0,0 +1,135 @@
+# sketch.py
+import pandas as pd
+import streamlit as st
+import data_loader as dl
+
+# -----------------------------------------------------
+# 기간 파티션별 근사 Top-K 요약 (Space-Saving 방식, 병합 가능)
+# -----------------------------------------------------
+SUMMARY_CAPACITY = 50  # 파티션/병합 결과당 유지하는 카운터 수
+PARTITION_COLS = ['연도', '분기', '월_표기', '주간_라벨']
+
+
+class TopKSummary:
+    """
+    기기별 발생 건수의 상위 카운터만 유지하는 요약
+
+    - counts: 기기별 하한 건수, errors: 기기별 최대 과소추정치 (실제 건수 <= counts + errors)
+    - types: 추적 중인 기기의 장애유형별 하한 건수 (합계가 counts와 같음)
+    - floor: 요약에 없는 기기의 최대 가능 건수
+    - type_name이 지정되면 해당 장애유형 건수 기준으로 순위를 매깁니다.
+      (유형별 건수 <= 전체 건수이므로 errors, floor는 그대로 유효)
+    - 여러 요약을 merge()로 합쳐도 카운터 수는 capacity를 넘지 않습니다.
+    """
+
+    def __init__(self, counts, errors, types, floor, type_totals, capacity=SUMMARY_CAPACITY, type_name=None):
+        self.counts = counts
+        self.errors = errors
+        self.types = types
+        self.floor = floor
+        self.type_totals = type_totals
+        self.capacity = capacity
+        self.type_name = type_name
+
+    @classmethod
+    def merge(cls, summaries, capacity=SUMMARY_CAPACITY, type_name=None):
+        """여러 파티션 요약을 하나로 병합 (빠진 기기는 해당 파티션의 floor만큼 오차에 더함)"""
+        summaries = list(summaries)
+        if not summaries: return cls({}, {}, {}, 0, {}, capacity, type_name)
+
+        total_floor = sum(s.floor for s in summaries)
+        counts, errors, types, seen_floor, type_totals = {}, {}, {}, {}, {}
+        for s in summaries:
+            for dev, cnt in s.counts.items():
+                counts[dev] = counts.get(dev, 0) + cnt
+                errors[dev] = errors.get(dev, 0) + s.errors[dev]
+                seen_floor[dev] = seen_floor.get(dev, 0) + s.floor
+                dev_types = types.setdefault(dev, {})
+                for err_type, err_cnt in s.types[dev].items():
+                    dev_types[err_type] = dev_types.get(err_type, 0) + err_cnt
+            for err_type, err_cnt in s.type_totals.items():
+                type_totals[err_type] = type_totals.get(err_type, 0) + err_cnt
+        for dev in counts:
+            errors[dev] += total_floor - seen_floor[dev]
+
+        kept = sorted(counts, key=counts.get, reverse=True)
+        dropped = kept[capacity:]
+        kept = kept[:capacity]
+        floor = max([total_floor] + [counts[d] + errors[d] for d in dropped])
+        return cls(
+            {d: counts[d] for d in kept}, {d: errors[d] for d in kept}, {d: types[d] for d in kept},
+            floor, type_totals, capacity, type_name
+        )
+
+    @property
+    def total(self):
+        """요약 대상 전체 건수 (type_name이 있으면 해당 유형만)"""
+        if self.type_name is None: return sum(self.type_totals.values())
+        return self.type_totals.get(self.type_name, 0)
+
+    def top(self, n=3):
+        """상위 n개 기기의 (기기명, 하한 건수, 최대 오차, {장애유형: 하한 건수}) 목록"""
+        if self.type_name is None:
+            scores = self.counts
+            breakdowns = self.types
+        else:
+            scores = {d: t.get(self.type_name, 0) for d, t in self.types.items()}
+            breakdowns = {d: {self.type_name: cnt} for d, cnt in scores.items()}
+        ranked = [d for d in sorted(scores, key=scores.get, reverse=True)[:n] if scores[d] > 0]
+        return [
+            (d, scores[d], self.errors[d], dict(sorted(breakdowns[d].items(), key=lambda x: x[1], reverse=True)))
+            for d in ranked
+        ]
+
+
+def summarize_partitions(df, capacity=SUMMARY_CAPACITY):
+    """기간 파티션(연도/분기/월/주)별로 상위 capacity개 기기와 그 장애유형별 건수만 남긴 요약 생성"""
+    if df.empty: return {}
+
+    dev_type = df.groupby(PARTITION_COLS + ['기기명', '장애유형'], observed=True, dropna=False).size().rename('건수').reset_index()
+    counts = dev_type.groupby(PARTITION_COLS + ['기기명'], observed=True, dropna=False)['건수'].sum().reset_index()
+    counts = counts.sort_values('건수', ascending=False, kind='stable')
+    counts['순위'] = counts.groupby(PARTITION_COLS, observed=True, dropna=False).cumcount()
+    type_parts = dict(list(dev_type.groupby(PARTITION_COLS, observed=True, sort=False, dropna=False)))
+
+    summaries = {}
+    for key, part in counts.groupby(PARTITION_COLS, observed=True, sort=False, dropna=False):
+        kept = part[part['순위'] < capacity]
+        # 파티션 내 건수는 정확하므로 오차는 0, 잘린 기기의 최대 건수가 floor
+        floor = int(part['건수'].iloc[capacity]) if len(part) > capacity else 0
+
+        type_part = type_parts[key]
+        types = {dev: {} for dev in kept['기기명']}
+        for dev, err_type, cnt in zip(type_part['기기명'], type_part['장애유형'], type_part['건수']):
+            if dev in types:
+                types[dev][err_type] = int(cnt)
+        type_totals = {t: int(c) for t, c in type_part.groupby('장애유형', dropna=False)['건수'].sum().items()}
+
+        summaries[key] = TopKSummary(
+            dict(zip(kept['기기명'], kept['건수'].astype(int))), dict.fromkeys(kept['기기명'], 0),
+            types, floor, type_totals, capacity
+        )
+    return summaries
+
+
+def load_partition_summaries(file_paths):
+    """통합 데이터의 파티션 요약 (소스 파일이 바뀔 때만 다시 계산)"""
+    return _partition_summaries(file_paths, dl.source_versions(file_paths))
+
+
+@st.cache_data(max_entries=8)
+def _partition_summaries(file_paths, versions):
+    return summarize_partitions(dl.combine_sources(file_paths, versions))
+
+
+def query_top_devices(summaries, type_name=None, **filters):
+    """
+    기간 조건에 맞는 파티션 요약만 병합해 근사 Top-K 요약 반환 (type_name이 있으면 해당 유형 기준 순위)
+    예) query_top_devices(summaries, type_name='지폐 미방출', 월_표기='2025년 01월')
+    """
+    idx = {col: i for i, col in enumerate(PARTITION_COLS)}
+    selected = [
+        s for key, s in summaries.items()
+        if all(key[idx[col]] == val for col, val in filters.items())
+    ]
+    return TopKSummary.merge(selected, type_name=type_name)
@@ -0,0 +1,86 @@
+# sources.py
+import os
+import pandas as pd
+
+# -----------------------------------------------------
+# 입력 소스 어댑터 (xlsx / csv / jsonl) + 공통 스키마 정규화
+# -----------------------------------------------------
+# 소스 설정 예시 (파일 경로 문자열만 넘기면 확장자로 형식을 추정하고 나머지는 기본값 사용)
+# {
+#     'path': 'site_a_incidents.csv',
+#     'format': 'csv',                              # xlsx / csv / jsonl (생략 시 확장자로 추정)
+#     'aliases': {'장애일시': '발생일', '키오스크': '기기명'},   # 원본 컬럼명 -> 표준 컬럼명
+#     'dtypes': {'기기명': 'string'},               # 표준 컬럼명 기준 dtype
+#     'timestamp_formats': {'발생일': '%Y/%m/%d', '발생시간': '%H:%M'},
+#     'chunksize': 50000,                           # csv/jsonl 스트리밍 단위(행)
+#     'encoding': 'cp949',                          # csv/jsonl 인코딩
+# }
+COMMON_ALIASES = {'접수일시': '발생일'}
+TIME_OF_DAY_COLUMNS = {'발생시간'}  # 날짜 없이 시각만 의미가 있는 컬럼 (엑셀의 time 값과 맞춤)
+DEFAULT_CHUNKSIZE = 50000
+EXTENSION_FORMATS = {'.xlsx': 'xlsx', '.xls': 'xlsx', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+def as_spec(source):
+    """경로 문자열 또는 설정 dict를 형식이 채워진 설정 dict로 변환"""
+    spec = {'path': source} if isinstance(source, str) else dict(source)
+    if 'format' not in spec:
+        ext = os.path.splitext(spec['path'])[1].lower()
+        if ext not in EXTENSION_FORMATS:
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {spec['path']}")
+        spec['format'] = EXTENSION_FORMATS[ext]
+    return spec
+
+
+def _read_xlsx(spec):
+    """엑셀 파일의 모든 시트를 시트 단위 청크로 반환"""
+    xls = pd.ExcelFile(spec['path'])
+    for sheet_name in xls.sheet_names:
+        yield xls.parse(sheet_name)
+
+
+def _read_csv(spec):
+    """CSV를 chunksize 행 단위로 스트리밍"""
+    yield from pd.read_csv(
+        spec['path'], chunksize=spec.get('chunksize', DEFAULT_CHUNKSIZE),
+        encoding=spec.get('encoding', 'utf-8'), dtype=str, keep_default_na=True
+    )
+
+
+def _read_jsonl(spec):
+    """JSON Lines를 chunksize 행 단위로 스트리밍 (타입 변환은 정규화 단계에서 수행)"""
+    with pd.read_json(
+        spec['path'], lines=True, chunksize=spec.get('chunksize', DEFAULT_CHUNKSIZE),
+        encoding=spec.get('encoding', 'utf-8'), dtype=False, convert_dates=False
+    ) as reader:
+        yield from reader
+
+
+READERS = {'xlsx': _read_xlsx, 'csv': _read_csv, 'jsonl': _read_jsonl}
+
+
+def normalize_chunk(chunk, spec):
+    """컬럼명 별칭, 시각 형식, dtype을 표준 스키마로 맞춤"""
+    aliases = {**COMMON_ALIASES, **spec.get('aliases', {})}
+    chunk = chunk.rename(columns={k: v for k, v in aliases.items() if k in chunk.columns})
+
+    formats = spec.get('timestamp_formats', {})
+    for col in set(formats) | {'발생일'}:
+        if col not in chunk.columns: continue
+        parsed = pd.to_datetime(chunk[col], format=formats.get(col), errors='coerce')
+        chunk[col] = parsed.dt.time if col in TIME_OF_DAY_COLUMNS else parsed
+
+    dtypes = {col: dtype for col, dtype in spec.get('dtypes', {}).items() if col in chunk.columns}
+    if dtypes:
+        chunk = chunk.astype(dtypes)
+    return chunk
+
+
+def iter_normalized_chunks(source):
+    """소스를 형식에 맞는 어댑터로 읽어 정규화된 청크를 순서대로 반환"""
+    spec = as_spec(source)
+    if spec['format'] not in READERS:
+        raise ValueError(f"지원하지 않는 소스 형식입니다: {spec['format']}")
+    for chunk in READERS[spec['format']](spec):
+        if not chunk.empty:
+            yield normalize_chunk(chunk, spec)
@@ -0,0 +1,89 @@
+# startup.py
+import threading
+import time
+
+# -----------------------------------------------------
+# 콜드 스타트 측정 및 서버 부팅 시 캐시 워밍
+# -----------------------------------------------------
+BOOT_TIME = time.time()  # server.py로 띄우면 서버 프로세스 시작 시각 (streamlit run이면 첫 실행의 임포트 시각)
+WARM_INTERVAL = 30       # 워밍 후 소스 파일 수정 여부를 확인하는 주기(초)
+
+_first_run_start = None
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def begin_first_run():
+    """프로세스의 첫 스크립트 실행 시작 시각을 기록하고, 이번 실행이 첫 실행인지 반환"""
+    global _first_run_start
+    with _metrics_lock:
+        if _first_run_start is not None: return False
+        _first_run_start = time.time()
+        return True
+
+
+def _record(name, since):
+    with _metrics_lock:
+        if name not in _metrics:
+            _metrics[name] = time.time() - since
+            print(f"[startup] {name}: {_metrics[name]:.2f}초")
+        return _metrics[name]
+
+
+def mark(name):
+    """첫 스크립트 실행 시작부터 name 시점까지 걸린 시간을 한 번만 기록 (실행 방식과 무관한 콜드 스타트 지표)"""
+    if _first_run_start is None: return None
+    return _record(name, _first_run_start)
+
+
+def mark_since_boot(name):
+    """서버 부팅부터 name 시점까지 걸린 시간을 한 번만 기록"""
+    return _record(name, BOOT_TIME)
+
+
+def cold_start_metrics():
+    """지금까지 기록된 {지표명: 경과 초}"""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def warm_caches(file_paths):
+    """데이터셋과 공통 집계를 미리 계산 (캐시는 소스 수정시각 기준이므로 이미 채워져 있으면 바로 반환)"""
+    import data_loader as dl
+    import anomaly as an
+    import sketch as sk
+    import charts  # plotly.express 등 차트 모듈 임포트도 미리 끝내 둠
+
+    df = dl.load_and_combine_data(file_paths)
+    if not df.empty:
+        sk.load_partition_summaries(file_paths)
+        an.rank_anomalies(df)
+
+
+def start_warmup(file_paths, interval=WARM_INTERVAL):
+    """
+    streamlit 런타임이 뜨면 백그라운드에서 캐시를 한 번 채우고,
+    이후에는 소스 파일의 수정시각이 바뀐 경우에만 새 버전을 미리 계산 (캐시를 비우지 않음)
+    """
+    def _run():
+        from streamlit import runtime
+        import data_loader as dl
+
+        # 런타임이 생기기 전에 호출하면 앱과 공유되지 않는 임시 캐시에 저장됨
+        while not runtime.exists():
+            time.sleep(0.1)
+        warmed = None
+        while True:
+            versions = dl.source_versions(file_paths)
+            if versions != warmed:
+                try:
+                    warm_caches(file_paths)
+                    warmed = versions
+                    mark_since_boot("부팅 → 캐시 워밍 완료")
+                except Exception as e:
+                    print(f"캐시 워밍 실패: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=_run, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread